@@ -1,19 +1,298 @@
+import io
 import os
 import json
 import shutil
+import argparse
+import subprocess
+import yaml
 from PIL import Image
-import random
+import struct
+import numpy as np
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 
-def find_all_files(root_dir, extensions):
-    files = []
-    for root, _, filenames in os.walk(root_dir):
-        for filename in filenames:
-            if any(filename.lower().endswith(ext) for ext in extensions):
-                files.append(os.path.join(root, filename))
-    return files
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+SKIP_DIRS = frozenset(['__pycache__'])
+LINK_MODES = ('hardlink', 'reflink', 'copy', 'uring')
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+URING_BATCH = 32
+URING_BATCH_BYTES = 64 * 1024 * 1024
+LARGE_JSON_BYTES = 64 * 1024 * 1024
+YOLO_LABEL_FORMAT = ['%d', '%.6f', '%.6f', '%.6f', '%.6f']
+LABEL_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+worker_image_index = {}
+
+def load_json(json_path):
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode('utf-8-sig'))
+
+def stream_json_items(json_path):
+    try:
+        with open(json_path, 'rb') as f:
+            if f.read(3) != b'\xef\xbb\xbf':
+                f.seek(0)
+            yield from ijson.kvitems(f, '', use_float=True)
+    except (OSError, ijson.JSONError) as e:
+        print(f"Error reading JSON {json_path}: {e}")
+
+def iter_json_items(json_path):
+    if ijson is not None and os.path.getsize(json_path) > LARGE_JSON_BYTES:
+        return stream_json_items(json_path)
+    return load_json(json_path).items()
+
+def fast_copy(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while copied < size:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError:
+                pass
+        if copied < size and hasattr(os, 'sendfile'):
+            try:
+                while copied < size:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), copied, size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError:
+                pass
+        if copied < size:
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+def write_label_file(label_path, yolo_labels):
+    buf = io.BytesIO()
+    np.savetxt(buf, yolo_labels, fmt=YOLO_LABEL_FORMAT)
+    data = memoryview(buf.getvalue())
+    fd = os.open(label_path, LABEL_OPEN_FLAGS, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def link_or_copy(src, dst, link_mode='hardlink'):
+    if link_mode == 'hardlink':
+        try:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    elif link_mode == 'reflink':
+        try:
+            subprocess.run(['cp', '--reflink=auto', '--preserve=mode,timestamps', src, dst],
+                           check=True, capture_output=True)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    fast_copy(src, dst)
+
+def uring_wait(ring, cqe, count):
+    results = {}
+    liburing.io_uring_submit(ring)
+    for _ in range(count):
+        liburing.io_uring_wait_cqe(ring, cqe)
+        entry = cqe[0]
+        results[entry.user_data] = entry.res
+        liburing.io_uring_cqe_seen(ring, entry)
+    return results
+
+def uring_copy_batch(ring, cqe, pairs, start):
+    jobs = {}
+    failed = []
+    batch_bytes = 0
+    i = start
+    while i < len(pairs) and len(jobs) < URING_BATCH and batch_bytes < URING_BATCH_BYTES:
+        src, dst = pairs[i]
+        i += 1
+        try:
+            src_fd = os.open(src, os.O_RDONLY)
+        except OSError:
+            failed.append((src, dst))
+            continue
+        try:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        except OSError:
+            os.close(src_fd)
+            failed.append((src, dst))
+            continue
+        buf = bytearray(os.fstat(src_fd).st_size)
+        batch_bytes += len(buf)
+        jobs[i] = (src, dst, src_fd, dst_fd, buf)
+        sqe = liburing.io_uring_get_sqe(ring)
+        liburing.io_uring_prep_read(sqe, src_fd, buf, 0)
+        liburing.io_uring_sqe_set_data64(sqe, i)
+    
+    read_results = uring_wait(ring, cqe, len(jobs))
+    write_count = 0
+    for job_id, (src, dst, src_fd, dst_fd, buf) in jobs.items():
+        if read_results.get(job_id) == len(buf):
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_write(sqe, dst_fd, buf, 0)
+            liburing.io_uring_sqe_set_data64(sqe, job_id)
+            write_count += 1
+    
+    write_results = uring_wait(ring, cqe, write_count)
+    for job_id, (src, dst, src_fd, dst_fd, buf) in jobs.items():
+        os.close(src_fd)
+        os.close(dst_fd)
+        if read_results.get(job_id) == len(buf) and write_results.get(job_id) == len(buf):
+            shutil.copystat(src, dst)
+        else:
+            failed.append((src, dst))
+    
+    errors = []
+    for src, dst in failed:
+        try:
+            fast_copy(src, dst)
+        except OSError as e:
+            errors.append((src, dst, e))
+    return i, errors
+
+def uring_supported():
+    if liburing is None:
+        print("liburing is not installed, falling back to regular copy")
+        return False
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(URING_BATCH, ring)
+    except OSError as e:
+        print(f"io_uring unavailable, falling back to regular copy: {e}")
+        return False
+    liburing.io_uring_queue_exit(ring)
+    return True
+
+def uring_copy_many(pairs):
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(URING_BATCH, ring)
+    errors = []
+    try:
+        start = 0
+        while start < len(pairs):
+            start, batch_errors = uring_copy_batch(ring, cqe, pairs, start)
+            errors.extend(batch_errors)
+    finally:
+        liburing.io_uring_queue_exit(ring)
+    return errors
+
+def walk_fast(root_dir, exclude_dirs=()):
+    excluded = {os.path.abspath(d) for d in exclude_dirs}
+    stack = [root_dir]
+    while stack:
+        current_dir = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if (not entry.name.startswith('.') and entry.name not in SKIP_DIRS
+                                and os.path.abspath(entry.path) not in excluded):
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError as e:
+            print(f"Error scanning {current_dir}: {e}")
+        stack.extend(reversed(subdirs))
+
+def find_dataset_files(root_dir, exclude_dirs=()):
+    json_files = []
+    image_files = []
+    for entry in walk_fast(root_dir, exclude_dirs):
+        name = entry.name.lower()
+        if name.endswith('.json'):
+            json_files.append(entry.path)
+        elif name.endswith(IMAGE_EXTENSIONS):
+            image_files.append(entry.path)
+    return json_files, image_files
+
+def read_jpeg_size(f):
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_SOF_MARKERS:
+            segment = f.read(7)
+            if len(segment) < 7:
+                return None
+            height, width = struct.unpack('>HH', segment[3:7])
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack('>H', length)[0]
+        if length < 2:
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+def read_image_size_from_header(image_path):
+    with open(image_path, 'rb') as f:
+        header = f.read(26)
+        if header.startswith(b'\x89PNG\r\n\x1a\n') and len(header) >= 24 and header[12:16] == b'IHDR':
+            return struct.unpack('>II', header[16:24])
+        if header.startswith(b'\xff\xd8'):
+            f.seek(2)
+            return read_jpeg_size(f)
+        if header.startswith(b'BM') and len(header) == 26:
+            if struct.unpack('<I', header[14:18])[0] == 12:
+                return struct.unpack('<HH', header[18:22])
+            width, height = struct.unpack('<ii', header[18:26])
+            return width, abs(height)
+    return None
+
+@lru_cache(maxsize=None)
 def parse_image_size(image_path):
     try:
+        img_size = read_image_size_from_header(image_path)
+        if img_size:
+            return img_size
         with Image.open(image_path) as img:
             return img.size
     except Exception as e:
@@ -26,109 +305,121 @@ def extract_class_from_region(region_attrs):
             return region_attrs[key]
     return 'unknown'
 
-def convert_polygon_to_bbox(all_points_x, all_points_y, img_width, img_height):
-    x_min = max(0, min(all_points_x))
-    x_max = min(img_width, max(all_points_x))
-    y_min = max(0, min(all_points_y))
-    y_max = min(img_height, max(all_points_y))
-    if x_min >= x_max or y_min >= y_max:
-        return None
-    
-    x_center = (x_min + x_max) / 2.0 / img_width
-    y_center = (y_min + y_max) / 2.0 / img_height
-    width = (x_max - x_min) / img_width
-    height = (y_max - y_min) / img_height
+def polygon_offsets(polygons):
+    lengths = np.fromiter(map(len, polygons), dtype=np.intp, count=len(polygons))
+    offsets = np.zeros_like(lengths)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return offsets
+
+def polygon_bounds(values, offsets):
+    return np.minimum.reduceat(values, offsets), np.maximum.reduceat(values, offsets)
+
+def convert_polygons_to_bboxes(polygons_x, polygons_y, img_width, img_height, clip=True):
+    all_x = np.fromiter(chain.from_iterable(polygons_x), dtype=np.float64)
+    all_y = np.fromiter(chain.from_iterable(polygons_y), dtype=np.float64)
+    offsets_x = polygon_offsets(polygons_x)
+    offsets_y = polygon_offsets(polygons_y)
     
-    if not (0 <= x_center <= 1 and 0 <= y_center <= 1 and 
-            0 <= width <= 1 and 0 <= height <= 1):
-        return None
+    x_min, x_max = polygon_bounds(all_x, offsets_x)
+    y_min, y_max = polygon_bounds(all_y, offsets_y)
+    if clip:
+        x_min = np.maximum(x_min, 0)
+        x_max = np.minimum(x_max, img_width)
+        y_min = np.maximum(y_min, 0)
+        y_max = np.minimum(y_max, img_height)
     
-    return [x_center, y_center, width, height]
+    bboxes = np.column_stack((
+        (x_min + x_max) / 2.0 / img_width,
+        (y_min + y_max) / 2.0 / img_height,
+        (x_max - x_min) / img_width,
+        (y_max - y_min) / img_height
+    ))
+    valid = (x_min < x_max) & (y_min < y_max) & ((bboxes >= 0) & (bboxes <= 1)).all(axis=1)
+    return bboxes, valid
 
-def process_single_json(json_path, images_base_dir, class_mapping):
-    annotations = {}
+def parse_and_collect(json_path, image_index):
+    classes = set()
+    records = []
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        json_items = iter_json_items(json_path)
     except Exception as e:
         print(f"Error reading JSON {json_path}: {e}")
-        return annotations
+        return classes, records
     
-    for image_key, image_data in data.items():
+    for image_key, image_data in json_items:
         filename = image_data['filename']
-        image_path = find_image_file(images_base_dir, filename)
-        if not image_path:
-            print(f"Image not found: {filename}")
-            continue
-        img_size = parse_image_size(image_path)
-        if not img_size:
-            continue
-            
-        img_width, img_height = img_size
         
-        yolo_annotations = []
+        class_names = []
+        polygons_x = []
+        polygons_y = []
         if 'regions' in image_data and image_data['regions']:
             for region_id, region in image_data['regions'].items():
                 shape_attrs = region['shape_attributes']
                 region_attrs = region['region_attributes']
                 
                 class_name = extract_class_from_region(region_attrs)
-                class_id = class_mapping.get(class_name)
-                
-                if class_id is None:
+                if not class_name or class_name == 'unknown':
                     print(f"Unknown class: {class_name} in {filename}")
                     continue
+                classes.add(class_name)
                 
-                if 'all_points_x' in shape_attrs and 'all_points_y' in shape_attrs:
-                    bbox = convert_polygon_to_bbox(
-                        shape_attrs['all_points_x'],
-                        shape_attrs['all_points_y'],
-                        img_width,
-                        img_height
-                    )
-                    
-                    if bbox:
-                        yolo_annotations.append(f"{class_id} {bbox[0]:.6f} {bbox[1]:.6f} {bbox[2]:.6f} {bbox[3]:.6f}")
+                if shape_attrs.get('all_points_x') and shape_attrs.get('all_points_y'):
+                    class_names.append(class_name)
+                    polygons_x.append(shape_attrs['all_points_x'])
+                    polygons_y.append(shape_attrs['all_points_y'])
         
-        annotations[filename] = {
+        image_path = find_image_file(image_index, filename)
+        if not image_path:
+            print(f"Image not found: {filename}")
+            continue
+        img_size = parse_image_size(image_path)
+        if not img_size:
+            continue
+            
+        img_width, img_height = img_size
+        
+        bboxes = np.empty((0, 4))
+        if class_names:
+            bboxes, valid = convert_polygons_to_bboxes(polygons_x, polygons_y, img_width, img_height)
+            class_names = [name for name, is_valid in zip(class_names, valid) if is_valid]
+            bboxes = bboxes[valid]
+        
+        records.append({
+            'filename': filename,
             'image_path': image_path,
-            'yolo_annotations': yolo_annotations,
-            'image_size': (img_width, img_height)
-        }
+            'image_size': (img_width, img_height),
+            'class_names': class_names,
+            'bboxes': bboxes
+        })
     
-    return annotations
+    return classes, records
 
-def find_image_file(images_base_dir, filename):
-    for root, _, files in os.walk(images_base_dir):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+def init_json_worker(image_index):
+    global worker_image_index
+    worker_image_index = image_index
 
-def create_class_mapping_from_jsons(json_files, images_base_dir):
-    all_classes = set()
-    
-    for json_path in json_files:
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            for image_data in data.values():
-                if 'regions' in image_data:
-                    for region in image_data['regions'].values():
-                        class_name = extract_class_from_region(region['region_attributes'])
-                        if class_name and class_name != 'unknown':
-                            all_classes.add(class_name)
-        except Exception as e:
-            print(f"Error analyzing classes in {json_path}: {e}")
-    
-    sorted_classes = sorted(list(all_classes))
+def parse_and_collect_in_worker(json_path):
+    return parse_and_collect(json_path, worker_image_index)
+
+def index_image_paths(image_paths):
+    index = {}
+    for image_path in image_paths:
+        index.setdefault(os.path.basename(image_path), image_path)
+    return index
+
+def find_image_file(image_index, filename):
+    return image_index.get(filename)
+
+def create_class_mapping(classes):
+    sorted_classes = sorted(list(classes))
     return {cls: idx for idx, cls in enumerate(sorted_classes)}
 
-def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0.2, test_ratio=0.0):
+def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0.2, test_ratio=0.0,
+                        link_mode='hardlink', seed=None):
+    parse_image_size.cache_clear()
     print("Searching for JSON files and images...")
-    json_files = find_all_files(input_base_dir, ['.json'])
-    image_files = find_all_files(input_base_dir, ['.jpg', '.jpeg', '.png', '.bmp'])
+    json_files, image_files = find_dataset_files(input_base_dir, exclude_dirs=[output_dir])
     
     print(f"Found JSON files: {len(json_files)}")
     print(f"Found images: {len(image_files)}")
@@ -136,15 +427,31 @@ def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0
     if not json_files:
         print("No JSON files found!")
         return
+    image_index = index_image_paths(image_files)
+    all_classes = set()
+    raw_records = []
+    with ProcessPoolExecutor(initializer=init_json_worker, initargs=(image_index,)) as executor:
+        results = executor.map(parse_and_collect_in_worker, json_files)
+        for json_path, (classes, records) in zip(json_files, results):
+            print(f"Processed {os.path.basename(json_path)}")
+            all_classes |= classes
+            raw_records.extend(records)
+    
     print("Creating class mapping...")
-    class_mapping = create_class_mapping_from_jsons(json_files, input_base_dir)
+    class_mapping = create_class_mapping(all_classes)
     print(f"Found classes: {class_mapping}")
     
     all_annotations = {}
-    for json_path in json_files:
-        print(f"Processing {os.path.basename(json_path)}...")
-        annotations = process_single_json(json_path, input_base_dir, class_mapping)
-        all_annotations.update(annotations)
+    for record in raw_records:
+        all_annotations[record['filename']] = {
+            'image_path': record['image_path'],
+            'yolo_annotations': np.column_stack((
+                [class_mapping[class_name] for class_name in record['class_names']],
+                record['bboxes']
+            )),
+            'image_size': record['image_size']
+        }
+    del raw_records
     
     print(f"Processed annotations for {len(all_annotations)} images")
     
@@ -160,7 +467,8 @@ def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0
     os.makedirs(os.path.join(test_dir, 'labels'), exist_ok=True)
     
     image_filenames = list(all_annotations.keys())
-    random.shuffle(image_filenames)
+    order = np.random.default_rng(seed).permutation(len(image_filenames))
+    image_filenames = [image_filenames[i] for i in order]
     
     total = len(image_filenames)
     train_count = int(total * train_ratio)
@@ -170,20 +478,35 @@ def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0
     val_files = image_filenames[train_count:train_count + val_count]
     test_files = image_filenames[train_count + val_count:]
     
+    use_uring = link_mode == 'uring' and uring_supported()
+    
     def copy_to_split(filenames, split_dir):
-        for filename in filenames:
+        dst_image_dir = os.path.join(split_dir, 'images')
+        dst_label_dir = os.path.join(split_dir, 'labels')
+        
+        def copy_one(filename):
             annotation_data = all_annotations[filename]
             
-            src_image_path = annotation_data['image_path']
-            dst_image_path = os.path.join(split_dir, 'images', filename)
-            shutil.copy2(src_image_path, dst_image_path)
+            if not use_uring:
+                src_image_path = annotation_data['image_path']
+                dst_image_path = os.path.join(dst_image_dir, filename)
+                link_or_copy(src_image_path, dst_image_path, link_mode)
             
             base_name = os.path.splitext(filename)[0]
-            dst_label_path = os.path.join(split_dir, 'labels', base_name + '.txt')
+            dst_label_path = os.path.join(dst_label_dir, base_name + '.txt')
             
-            with open(dst_label_path, 'w') as f:
-                for ann in annotation_data['yolo_annotations']:
-                    f.write(ann + '\n')
+            write_label_file(dst_label_path, annotation_data['yolo_annotations'])
+        
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+            if use_uring:
+                pairs = [(all_annotations[filename]['image_path'], os.path.join(dst_image_dir, filename))
+                         for filename in filenames]
+                uring_future = executor.submit(uring_copy_many, pairs)
+            list(executor.map(copy_one, filenames))
+            if use_uring:
+                errors = uring_future.result()
+                if errors:
+                    raise errors[0][2]
     
     print("Creating train set...")
     copy_to_split(train_files, train_dir)
@@ -212,36 +535,36 @@ def create_yolo_dataset(input_base_dir, output_dir, train_ratio=0.8, val_ratio=0
     print(f"  Classes file: {classes_path}")
 
 def create_yolo_yaml(output_dir, class_mapping):
-    yaml_content = f"""# YOLO dataset configuration
-path: {os.path.abspath(output_dir)}
-train: train/images
-val: val/images
-test: test/images
-
-# Classes
-nc: {len(class_mapping)}
-names: {list(class_mapping.keys())}
-"""
+    class_names = list(class_mapping)
+    config = {
+        'path': os.path.abspath(output_dir),
+        'train': 'train/images',
+        'val': 'val/images',
+        'test': 'test/images',
+        'nc': len(class_names),
+        'names': class_names
+    }
     
     yaml_path = os.path.join(output_dir, 'dataset.yaml')
-    with open(yaml_path, 'w') as f:
-        f.write(yaml_content)
+    with open(yaml_path, 'w', encoding='utf-8') as f:
+        f.write("# YOLO dataset configuration\n")
+        yaml.safe_dump(config, f, sort_keys=False, allow_unicode=True)
     
     print(f"YAML config created: {yaml_path}")
-def simple_create_dataset(input_dir, output_dir):
+def simple_create_dataset(input_dir, output_dir, link_mode='hardlink'):
+    parse_image_size.cache_clear()
     all_data = {}
+    json_files, image_files = find_dataset_files(input_dir, exclude_dirs=[output_dir])
+    image_index = index_image_paths(image_files)
     
-    for root, dirs, files in os.walk(input_dir):
-        for file in files:
-            if file.endswith('.json'):
-                json_path = os.path.join(root, file)
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    all_data.update(data)
-                    print(f"Loaded JSON: {file}")
-                except Exception as e:
-                    print(f"Error loading {file}: {e}")
+    for json_path in json_files:
+        file = os.path.basename(json_path)
+        try:
+            data = load_json(json_path)
+            all_data.update(data)
+            print(f"Loaded JSON: {file}")
+        except Exception as e:
+            print(f"Error loading {file}: {e}")
     
     print(f"Found annotations: {len(all_data)}")
     images_dir = os.path.join(output_dir, 'images')
@@ -251,57 +574,49 @@ def simple_create_dataset(input_dir, output_dir):
     
     processed_count = 0
     error_count = 0
+    use_uring = link_mode == 'uring' and uring_supported()
+    pending = []
 
     for image_key, image_data in all_data.items():
         filename = image_data['filename']
-        image_path = None
-        for root, dirs, files in os.walk(input_dir):
-            if filename in files:
-                image_path = os.path.join(root, filename)
-                break
+        image_path = find_image_file(image_index, filename)
         
         if not image_path:
             print(f"Image not found: {filename}")
             error_count += 1
             continue
-        try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-        except Exception as e:
-            print(f"Error opening {filename}: {e}")
+        img_size = parse_image_size(image_path)
+        if not img_size:
             error_count += 1
             continue
-        yolo_lines = []
+        width, height = img_size
+        yolo_labels = np.empty((0, 5))
         regions = image_data.get('regions', {})
         
         if not regions:
             print(f"No annotations for {filename}")
             continue
-            
+        
+        polygons_x = []
+        polygons_y = []
         for region_id, region in regions.items():
             shape = region['shape_attributes']
-            if 'all_points_x' in shape:
-                x_points = shape['all_points_x']
-                y_points = shape['all_points_y']
-                
-                x_min, x_max = min(x_points), max(x_points)
-                y_min, y_max = min(y_points), max(y_points)
-                if x_min >= x_max or y_min >= y_max:
-                    continue
-                
-                x_center = (x_min + x_max) / 2 / width
-                y_center = (y_min + y_max) / 2 / height
-                w = (x_max - x_min) / width
-                h = (y_max - y_min) / height
-                if not (0 <= x_center <= 1 and 0 <= y_center <= 1 and 0 <= w <= 1 and 0 <= h <= 1):
-                    continue
-                yolo_lines.append(f"0 {x_center:.6f} {y_center:.6f} {w:.6f} {h:.6f}")
-        if yolo_lines:
+            if shape.get('all_points_x') and shape.get('all_points_y'):
+                polygons_x.append(shape['all_points_x'])
+                polygons_y.append(shape['all_points_y'])
+        
+        if polygons_x:
+            bboxes, valid = convert_polygons_to_bboxes(polygons_x, polygons_y, width, height, clip=False)
+            bboxes = bboxes[valid]
+            yolo_labels = np.column_stack((np.zeros(len(bboxes)), bboxes))
+        if len(yolo_labels):
+            if use_uring:
+                pending.append((filename, image_path, yolo_labels))
+                continue
             try:
-                shutil.copy2(image_path, os.path.join(images_dir, filename))
+                link_or_copy(image_path, os.path.join(images_dir, filename), link_mode)
                 label_name = os.path.splitext(filename)[0] + '.txt'
-                with open(os.path.join(labels_dir, label_name), 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(yolo_lines))
+                write_label_file(os.path.join(labels_dir, label_name), yolo_labels)
                 
                 processed_count += 1
                 print(f"SUCCESS: Processed {filename}")
@@ -311,6 +626,25 @@ def simple_create_dataset(input_dir, output_dir):
         else:
             print(f"WARNING: No valid annotations for {filename}")
             error_count += 1
+    
+    if pending:
+        pairs = [(image_path, os.path.join(images_dir, filename)) for filename, image_path, _ in pending]
+        copy_errors = {dst: e for src, dst, e in uring_copy_many(pairs)}
+        for filename, image_path, yolo_labels in pending:
+            copy_error = copy_errors.get(os.path.join(images_dir, filename))
+            if copy_error:
+                print(f"ERROR saving {filename}: {copy_error}")
+                error_count += 1
+                continue
+            try:
+                label_name = os.path.splitext(filename)[0] + '.txt'
+                write_label_file(os.path.join(labels_dir, label_name), yolo_labels)
+                
+                processed_count += 1
+                print(f"SUCCESS: Processed {filename}")
+            except Exception as e:
+                print(f"ERROR saving {filename}: {e}")
+                error_count += 1
     with open(os.path.join(output_dir, 'classes.txt'), 'w', encoding='utf-8') as f:
         f.write("crayfish\n")
     
@@ -322,8 +656,14 @@ if __name__ == "__main__":
     INPUT_DIR = r"C:\Users\sergs\Desktop\rak"
     OUTPUT_DIR = "yolo_dataset"
     
+    parser = argparse.ArgumentParser(description="Convert VIA polygon annotations into a YOLO dataset")
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='hardlink',
+                        help="how images are placed into the dataset (default: hardlink)")
+    args = parser.parse_args()
+    
     print("Starting YOLO dataset creation...")
     print(f"Input folder: {INPUT_DIR}")
     print(f"Output folder: {OUTPUT_DIR}")
+    print(f"Link mode: {args.link_mode}")
 
-    simple_create_dataset(INPUT_DIR, OUTPUT_DIR)
\ No newline at end of file
+    simple_create_dataset(INPUT_DIR, OUTPUT_DIR, args.link_mode)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import shutil
 import random
+import yaml
 from pathlib import Path
 
 def create_yolo_structure(dataset_path, output_dir, train_ratio=0.8, val_ratio=0.2, test_ratio=0.0):
@@ -91,20 +92,19 @@ def create_yolo_yaml(output_dir):
         with open(classes_path, 'w', encoding='utf-8') as f:
             f.write("crayfish\n")
     
-    yaml_content = f"""# YOLO dataset configuration
-path: {os.path.abspath(output_dir)}
-train: train/images
-val: val/images
-test: test/images
-
-# Classes
-nc: {len(class_names)}
-names: {class_names}
-"""
+    config = {
+        'path': os.path.abspath(output_dir),
+        'train': 'train/images',
+        'val': 'val/images',
+        'test': 'test/images',
+        'nc': len(class_names),
+        'names': class_names
+    }
     
     yaml_path = os.path.join(output_dir, 'dataset.yaml')
     with open(yaml_path, 'w', encoding='utf-8') as f:
-        f.write(yaml_content)
+        f.write("# YOLO dataset configuration\n")
+        yaml.safe_dump(config, f, sort_keys=False, allow_unicode=True)
     
     print(f"YAML файл создан: {yaml_path}")
 